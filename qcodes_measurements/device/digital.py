@@ -1,8 +1,6 @@
 """
 Support functions for digital gates
 """
-from functools import partial
-
 from qcodes import ChannelList
 from qcodes.utils.validators import Numbers, Bool, MultiType, Enum
 
@@ -46,12 +44,17 @@ class DigitalGate(Gate):
         self.vals = MultiType(Bool(), Numbers())
         self._v_high = v_high
         self._v_low = v_low
-        self.v_hist = v_hist
+        self._v_hist = v_hist
+        self._recompute_bounds()
         if io_mode is None:
             io_mode = DigitalMode.UNDEF
         self.io_mode = io_mode
         # If a gate is locked, it's value won't be changed
         self.lock = False
+        # Last logical value written to the gate, and the raw source voltage it was
+        # written with. This is returned while the gate is locked.
+        self._last_set = None
+        self._last_set_raw = None
 
     @property
     def v_high(self):
@@ -61,12 +64,15 @@ class DigitalGate(Gate):
         return self._v_high
     @v_high.setter
     def v_high(self, val):
+        # Only re-drive the output if it is currently sitting on the high rail
+        redrive = self.io_mode in DigitalMode.OUTPUT_MODES and self.get_raw() == 1
         self._v_high = val
-        lock = self.lock
-        self.lock = False
-        if self.io_mode in DigitalMode.OUTPUT_MODES:
-            self(self())
-        self.lock = lock
+        self._recompute_bounds()
+        if redrive:
+            self.source.voltage(val)
+            self._store_last_set(1)
+        else:
+            self.forget_last_set()
 
     @property
     def v_low(self):
@@ -76,21 +82,68 @@ class DigitalGate(Gate):
         return self._v_low
     @v_low.setter
     def v_low(self, val):
+        # Only re-drive the output if it is currently sitting on the low rail
+        redrive = self.io_mode in DigitalMode.OUTPUT_MODES and self.get_raw() == 0
         self._v_low = val
-        lock = self.lock
-        self.lock = False
-        if self.io_mode in DigitalMode.OUTPUT_MODES:
-            self(self())
-        self.lock = lock
+        self._recompute_bounds()
+        if redrive:
+            self.source.voltage(val)
+            self._store_last_set(0)
+        else:
+            self.forget_last_set()
+
+    def _store_last_set(self, value):
+        """
+        Remember the logical value just written to the gate, along with the raw
+        voltage of the source
+        """
+        self._last_set = value
+        self._last_set_raw = self.source.voltage.cache.raw_value
+
+    def forget_last_set(self):
+        """
+        Forget the last value set on this gate, forcing the next get to query the source.
+        This should be called whenever the source may have changed without going through
+        this gate.
+        """
+        self._last_set = None
+        self._last_set_raw = None
+
+    @property
+    def v_hist(self):
+        """
+        Get/Set range around v_high/v_low around which a high/low value will be read
+        """
+        return self._v_hist
+    @v_hist.setter
+    def v_hist(self, val):
+        self._v_hist = val
+        self._recompute_bounds()
+        # The logical value of the gate may change with the new windows
+        self.forget_last_set()
+
+    def _recompute_bounds(self):
+        """
+        Cache the voltage windows in which a high/low value will be read
+        """
+        self._hi_lo = self._v_high - self._v_hist
+        self._hi_hi = self._v_high + self._v_hist
+        self._lo_lo = self._v_low - self._v_hist
+        self._lo_hi = self._v_low + self._v_hist
 
     def get_raw(self): #pylint: disable=E0202
         """
-        Return the state of the gate if within the defined setpoints, otherwise return 0
+        Return the state of the gate if within the defined setpoints, otherwise return -1.
+        If the gate is locked, the last value set is returned without querying the source,
+        provided the source voltage hasn't been changed elsewhere since.
         """
+        if self.lock and self._last_set is not None \
+                and self.source.voltage.cache.raw_value == self._last_set_raw:
+            return self._last_set
         voltage = self.source.voltage()
-        if abs(voltage - self.v_high) < self.v_hist:
+        if self._hi_lo < voltage < self._hi_hi:
             return 1
-        if abs(voltage - self.v_low) < self.v_hist:
+        if self._lo_lo < voltage < self._lo_hi:
             return 0
         return -1
 
@@ -105,6 +158,7 @@ class DigitalGate(Gate):
             self.source.voltage(self.v_high)
         else:
             self.source.voltage(self.v_low)
+        self._store_last_set(1 if value else 0)
 
 class DigitalGateWrapper(ChannelWrapper):
     """
@@ -130,18 +184,18 @@ class DigitalGateWrapper(ChannelWrapper):
                            vals=Enum(*DigitalMode))
 
         self.add_parameter("lock",
-                           get_cmd=partial(getattr, self.gate, "lock"),
-                           set_cmd=partial(setattr, self.gate, "lock"),
+                           get_cmd=lambda: self.gate.lock,
+                           set_cmd=lambda val: setattr(self.gate, "lock", val),
                            vals=Bool())
 
         self.add_parameter("v_high",
-                           get_cmd=partial(getattr, self.gate, "v_high"),
-                           set_cmd=partial(setattr, self.gate, "v_high"),
+                           get_cmd=lambda: self.gate.v_high,
+                           set_cmd=lambda val: setattr(self.gate, "v_high", val),
                            vals=self.parent.voltage.vals)
 
         self.add_parameter("v_low",
-                           get_cmd=partial(getattr, self.gate, "v_low"),
-                           set_cmd=partial(setattr, self.gate, "v_low"),
+                           get_cmd=lambda: self.gate.v_low,
+                           set_cmd=lambda val: setattr(self.gate, "v_low", val),
                            vals=self.parent.voltage.vals)
 
         # Note: we override the voltage parameter here, since by default the GateWrapper
@@ -156,33 +210,35 @@ class DigitalGateWrapper(ChannelWrapper):
 
 
     def _set_io_mode(self, val):
+        try:
+            set_mode = self._IO_MODE_DISPATCH[val]
+        except KeyError:
+            raise ValueError("Invalid IO Mode") from None
         self.lock(False)
+        # The source may be reconfigured below, so forget the last set value
+        self.gate.forget_last_set()
         if val in DigitalMode.INPUT_MODES:
             self.voltage(0)
-        if val == DigitalMode.IN:
-            self.smc()
-        elif val == DigitalMode.OUT:
-            self.dac()
-        elif val == DigitalMode.PROBE_OUT:
-            self.probe()
-        elif val == DigitalMode.BUS_OUT:
-            self.state(ConnState.DAC_BUS)
-        elif val == DigitalMode.HIGH:
-            self.dac()
-            self.out(1)
-            self.lock(True)
-        elif val == DigitalMode.LOW:
-            self.dac()
-            self.out(0)
-            self.lock(True)
-        elif val == DigitalMode.GND:
-            self.ground()
-        elif val == DigitalMode.FLOAT:
-            self.open()
-        else:
-            raise ValueError("Invalid IO Mode")
+        set_mode(self)
         self.gate.io_mode = val
 
+    def set_state(self, val):
+        # Changing the connection state may change the output, even on a locked gate
+        self.gate.forget_last_set()
+        super().set_state(val)
+
+    # Actions required to put the gate into each IO mode
+    _IO_MODE_DISPATCH = {
+        DigitalMode.IN: lambda self: self.smc(),
+        DigitalMode.OUT: lambda self: self.dac(),
+        DigitalMode.PROBE_OUT: lambda self: self.probe(),
+        DigitalMode.BUS_OUT: lambda self: self.state(ConnState.DAC_BUS),
+        DigitalMode.HIGH: lambda self: (self.dac(), self.out(1), self.lock(True)),
+        DigitalMode.LOW: lambda self: (self.dac(), self.out(0), self.lock(True)),
+        DigitalMode.GND: lambda self: self.ground(),
+        DigitalMode.FLOAT: lambda self: self.open(),
+    }
+
 class MDACDigitalGateWrapper(DigitalGateWrapper, MDACGateWrapper):
     """
     Digital gate wrapper of an MDAC, which allows set/get of state
@@ -197,6 +253,25 @@ class BBDigitalGateWrapper(DigitalGateWrapper, BBGateWrapper):
     Digital gate wrapper of an BB, which allows set/get of state
     """
 
+# Wrapper class to use for each type of voltage source
+_WRAPPER_FOR_SOURCE = {
+    MDAC.MDACChannel: MDACDigitalGateWrapper,
+    BBChan: BBDigitalGateWrapper,
+}
+
+def _wrapper_for_source(source):
+    """
+    Return the digital gate wrapper class for a given voltage source
+    """
+    wrapper_cls = _WRAPPER_FOR_SOURCE.get(type(source))
+    if wrapper_cls is not None:
+        return wrapper_cls
+    # Fall back to checking for subclasses of the known source types
+    for source_cls, wrapper_cls in _WRAPPER_FOR_SOURCE.items():
+        if isinstance(source, source_cls):
+            return wrapper_cls
+    return DigitalGateWrapper
+
 class DigitalDevice(Device):
     """
     Device which expects digital control as well as potential analog
@@ -208,18 +283,20 @@ class DigitalDevice(Device):
         # Add digital gates to the device
         digital_gates = ChannelList(self, "digital_gates", DigitalGateWrapper)
         self.add_submodule("digital_gates", digital_gates)
+        # Map of gate name to wrapper, for fast controller lookup
+        self._digital_gate_map = {}
 
         # Add digital parameters
         self._v_high = 1.8
         self._v_low = 0
         self.add_parameter("v_high",
                            initial_value=1.8,
-                           get_cmd=partial(getattr, self, "_v_high"),
+                           get_cmd=lambda: self._v_high,
                            set_cmd=self._update_vhigh,
                            vals=Numbers())
         self.add_parameter("v_low",
                            initial_value=0,
-                           get_cmd=partial(getattr, self, "_v_low"),
+                           get_cmd=lambda: self._v_low,
                            set_cmd=self._update_vlow,
                            vals=Numbers())
 
@@ -241,12 +318,10 @@ class DigitalDevice(Device):
 
     def store_new_param(self, new_param):
         if isinstance(new_param, DigitalGate):
-            if isinstance(new_param.source, MDAC.MDACChannel):
-                self.digital_gates.append(MDACDigitalGateWrapper(new_param, new_param.name))
-            elif isinstance(new_param.source, BBChan):
-                self.digital_gates.append(BBDigitalGateWrapper(new_param, new_param.name))
-            else:
-                self.digital_gates.append(DigitalGateWrapper(new_param, new_param.name))
+            wrapper_cls = _wrapper_for_source(new_param.source)
+            wrapper = wrapper_cls(new_param, new_param.name)
+            self.digital_gates.append(wrapper)
+            self._digital_gate_map[new_param.name] = wrapper
         else:
             super().store_new_param(new_param)
 
@@ -264,5 +339,5 @@ class DigitalDevice(Device):
         Return the channel controller for a given parameter
         """
         if isinstance(param, DigitalGate):
-            return getattr(self.digital_gates, param.name)
+            return self._digital_gate_map[param.name]
         return super().get_channel_controller(param)
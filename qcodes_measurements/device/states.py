@@ -16,8 +16,9 @@ class ConnState(str, enum.Enum):
     PROBE = enum.auto()
     UNDEF = enum.auto()
 
-ConnState.OUTPUT_MODES = (ConnState.GND, ConnState.DAC, ConnState.DAC_BUS, ConnState.PROBE)
-ConnState.INPUT_MODES  = (ConnState.BUS, ConnState.SMC, ConnState.FLOAT)
+ConnState.OUTPUT_MODES = frozenset((ConnState.GND, ConnState.DAC, ConnState.DAC_BUS,
+                                    ConnState.PROBE))
+ConnState.INPUT_MODES  = frozenset((ConnState.BUS, ConnState.SMC, ConnState.FLOAT))
 
 class DigitalMode(str, enum.Enum):
     """
@@ -58,6 +59,7 @@ class DigitalMode(str, enum.Enum):
         else:
             return DigitalMode.UNDEF
 
-DigitalMode.OUTPUT_MODES = (DigitalMode.OUT, DigitalMode.PROBE_OUT, DigitalMode.HIGH,
-                            DigitalMode.LOW, DigitalMode.GND)
-DigitalMode.INPUT_MODES = (DigitalMode.IN, DigitalMode.FLOAT)
+# Stored as frozensets so that membership tests are a hash lookup
+DigitalMode.OUTPUT_MODES = frozenset((DigitalMode.OUT, DigitalMode.PROBE_OUT, DigitalMode.HIGH,
+                                      DigitalMode.LOW, DigitalMode.GND))
+DigitalMode.INPUT_MODES = frozenset((DigitalMode.IN, DigitalMode.FLOAT))